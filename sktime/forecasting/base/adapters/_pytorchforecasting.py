@@ -3,6 +3,7 @@
 import abc
 import functools
 import os
+import sys
 import time
 import typing
 from copy import deepcopy
@@ -40,10 +41,18 @@ class _PytorchForecastingAdapter(_BaseGlobalForecaster):
         by default {"train": False}
     model_path: string (default=None)
         try to load a existing model without fitting.
+    compile_model : bool (default=False)
+        whether to compile the model with `torch.compile` [2]_ for training and
+        prediction, compilation happens in the first forward pass.
+        If True and cuda is available, training uses mixed precision by default,
+        bf16 if supported by the gpu, else fp16,
+        unless precision is set in trainer_params
+        or the accelerator in trainer_params is cpu.
 
     References
     ----------
     .. [1] https://pytorch-forecasting.readthedocs.io/en/stable/api/pytorch_forecasting.data.timeseries.TimeSeriesDataSet.html
+    .. [2] https://pytorch.org/docs/stable/generated/torch.compile.html
     """  # noqa: E501
 
     _tags = {
@@ -85,6 +94,7 @@ class _PytorchForecastingAdapter(_BaseGlobalForecaster):
         trainer_params: Optional[Dict[str, Any]] = None,
         model_path: Optional[str] = None,
         random_log_path: bool = False,
+        compile_model: bool = False,
     ) -> None:
         self.model_params = model_params
         self.dataset_params = dataset_params
@@ -110,6 +120,7 @@ class _PytorchForecastingAdapter(_BaseGlobalForecaster):
             else {}
         )
         self.random_log_path = random_log_path
+        self.compile_model = compile_model
         super().__init__()
 
     @functools.cached_property
@@ -136,8 +147,6 @@ class _PytorchForecastingAdapter(_BaseGlobalForecaster):
             **self.algorithm_parameters,
             **self._model_params,
         )
-        import lightning.pytorch as pl
-
         if self.random_log_path:
             if "logger" not in self._trainer_params.keys():
                 if "default_root_dir" not in self._trainer_params.keys():
@@ -152,7 +161,24 @@ class _PytorchForecastingAdapter(_BaseGlobalForecaster):
                     )
                     self._trainer_params["default_root_dir"] = self._random_log_dir
 
-        trainer_instance = pl.Trainer(**self._trainer_params)
+        if self.compile_model:
+            import torch
+
+            # lightning unwraps the compiled module for checkpointing
+            algorithm_instance = torch.compile(algorithm_instance)
+            # mixed precision on cpu would fall back to slow bf16 autocast
+            if (
+                torch.cuda.is_available()
+                and self._trainer_params.get("accelerator") != "cpu"
+            ):
+                self._trainer_params.setdefault(
+                    "precision",
+                    "bf16-mixed" if torch.cuda.is_bf16_supported() else "16-mixed",
+                )
+
+        # multi gpu defaults, only used if not set by the user
+        _set_trainer_defaults(self._trainer_params)
+        trainer_instance = _pl().Trainer(**self._trainer_params)
         return algorithm_instance, trainer_instance
 
     def _fit(
@@ -205,16 +231,40 @@ class _PytorchForecastingAdapter(_BaseGlobalForecaster):
         # because those names could be None or non-string type.
         if X is not None:
             self._X_columns = X.columns.tolist()
+            self._new_X_columns = [
+                "_X_column_" + str(i) for i in range(len(self._X_columns))
+            ]
+        self._new_index_names = [
+            "_index_name_" + str(i) for i in range(len(self._index_names))
+        ]
+        self._new_target_name = "_target_column"
+        # set from the dtypes of X when the first dataset is built
+        self._time_varying_known_reals = None
         # convert data to pytorch-forecasting datasets
         training, validation = self._Xy_to_dataset(
             _X, _y, self._dataset_params, self._max_prediction_length
         )
+        # keep the training dataset, its fitted scalers and encoders are reused
+        # in predict
+        self._training_dataset = training
+        # absolute horizons are computed and cached in predict
+        self._horizons_cache_key = None
         if self.model_path is None:
             # instantiate forecaster and trainer
             self._forecaster, self._trainer = self._instantiate_model(training)
             # convert dataset to dataloader
             self._train_to_dataloader_params["train"] = True
             self._validation_to_dataloader_params["train"] = False
+            # performance defaults of the dataloaders used in fit,
+            # only used if not set by the user
+            # the validation parameters are copied, in predict the dataloader
+            # is only iterated once and worker processes would not pay off
+            _set_dataloader_defaults(
+                self._train_to_dataloader_params, self._trainer_params
+            )
+            validation_to_dataloader_params = _set_dataloader_defaults(
+                dict(self._validation_to_dataloader_params), self._trainer_params
+            )
             # call the fit function of the pytorch-forecasting model
             self._trainer.fit(
                 self._forecaster,
@@ -222,17 +272,37 @@ class _PytorchForecastingAdapter(_BaseGlobalForecaster):
                     **self._train_to_dataloader_params
                 ),
                 val_dataloaders=validation.to_dataloader(
-                    **self._validation_to_dataloader_params
+                    **validation_to_dataloader_params
                 ),
             )
             # load model from checkpoint
             best_model_path = self._trainer.checkpoint_callback.best_model_path
-            self.best_model = self.algorithm_class.load_from_checkpoint(best_model_path)
+            self.best_model = self._load_model(best_model_path)
         else:
             # load model from disk
-            self.best_model = self.algorithm_class.load_from_checkpoint(self.model_path)
+            self.best_model = self._load_model(self.model_path)
         return self
 
+    def __getstate__(self):
+        """Get the state for pickling and copying, without the compiled forward.
+
+        The compiled forward of ``best_model`` cannot be pickled,
+        it is compiled again in the next predict call after unpickling.
+        """
+        state = self.__dict__.copy()
+        state.pop("_compiled_forward", None)
+        return state
+
+    def _load_model(self, path):
+        """Load the model from a checkpoint for inference."""
+        # weights are loaded to cpu directly instead of the device they were saved
+        # from, the trainer used in predict moves the model to its accelerator
+        model = self.algorithm_class.load_from_checkpoint(path, map_location="cpu")
+        # the model is only used for inference from here on,
+        # freeze sets requires_grad=False for all parameters and switches to eval mode
+        model.freeze()
+        return model
+
     def _predict(
         self: "_PytorchForecastingAdapter",
         fh: typing.Optional[ForecastingHorizon],
@@ -287,9 +357,61 @@ class _PytorchForecastingAdapter(_BaseGlobalForecaster):
         not the time points to be predicted.
         """
         if y is None:
-            y = deepcopy(self._y)
+            y = self._y
         if X is None:
-            X = deepcopy(self._X)
+            X = self._X
+        validation = self._build_predict_dataset(X, y, fh)
+        if self.compile_model and "_compiled_forward" not in self.__dict__.keys():
+            import torch
+
+            # the actual compilation happens in the first forward pass
+            # not stored in the state for pickling, see __getstate__
+            self._compiled_forward = torch.compile(
+                self.best_model.forward, mode="reduce-overhead"
+            )
+        # the loaded model is frozen already, but best_model is public
+        # and might have been switched back to training mode by the user
+        self.best_model.eval()
+        # the compiled forward is only set on best_model during predict,
+        # so best_model stays picklable
+        if self.compile_model:
+            self.best_model.forward = self._compiled_forward
+        try:
+            predictions = self.best_model.predict(
+                validation.to_dataloader(**self._validation_to_dataloader_params),
+                return_x=True,
+                return_index=True,
+                return_decoder_lengths=True,
+                trainer_kwargs=(
+                    {"default_root_dir": self._random_log_dir}
+                    if "_random_log_dir" in self.__dict__.keys()
+                    else None
+                ),
+            )
+        finally:
+            if self.compile_model:
+                # falls back to the forward method of the class
+                del self.best_model.forward
+        # convert pytorch-forecasting predictions to dataframe
+        output = self._predictions_to_dataframe(
+            predictions, self._max_prediction_length
+        )
+
+        absolute_horizons, horizons_values = self._get_absolute_horizons()
+        time_index = output.index.get_level_values(-1)
+        time_values = _isin_values(time_index)
+        if (
+            horizons_values is not None
+            and time_values is not None
+            and time_index.dtype == absolute_horizons.dtype
+        ):
+            dateindex = np.isin(time_values, horizons_values)
+        else:
+            dateindex = time_index.isin(absolute_horizons)
+        return output.loc[dateindex]
+
+    def _build_predict_dataset(self, X, y, fh):
+        """Build the pytorch-forecasting dataset to predict from."""
         if X is not None and not self._global_forecasting:
             X = pd.concat([self._X, X])
         # convert series to frame
@@ -300,186 +422,252 @@ class _PytorchForecastingAdapter(_BaseGlobalForecaster):
         # check if dummy X is needed
         _X = self._dummy_X(_X, _y)
         # convert data to pytorch-forecasting datasets
-        training, validation = self._Xy_to_dataset(
-            _X, _y, self._dataset_params, self._max_prediction_length
-        )
-        predictions = self.best_model.predict(
-            validation.to_dataloader(**self._validation_to_dataloader_params),
-            return_x=True,
-            return_index=True,
-            return_decoder_lengths=True,
-            trainer_kwargs=(
-                {"default_root_dir": self._random_log_dir}
-                if "_random_log_dir" in self.__dict__.keys()
-                else None
-            ),
-        )
-        # convert pytorch-forecasting predictions to dataframe
-        output = self._predictions_to_dataframe(
-            predictions, self._max_prediction_length
+        # the training dataset from fit can be reused if no new y is passed,
+        # in global forecasting y could contain instances unseen in fit
+        _, validation = self._Xy_to_dataset(
+            _X,
+            _y,
+            self._dataset_params,
+            self._max_prediction_length,
+            predict_only=not self._global_forecasting,
         )
+        return validation
 
-        absolute_horizons = self.fh.to_absolute_index(self.cutoff)
-        dateindex = output.index.get_level_values(-1).map(
-            lambda x: x in absolute_horizons
-        )
-        return output.loc[dateindex]
+    def _get_absolute_horizons(self):
+        """Get absolute horizons and their values for np.isin, cached per fh, cutoff.
 
-    def _Xy_to_dataset(
-        self,
-        X: pd.DataFrame,
-        y: pd.DataFrame,
-        dataset_params: Dict[str, Any],
-        max_prediction_length,
-    ):
-        from pytorch_forecasting.data import TimeSeriesDataSet
+        Returns
+        -------
+        absolute_horizons : pd.Index
+            absolute time points of ``self.fh`` at ``self.cutoff``
+        horizons_values : np.ndarray or None
+            numeric values of ``absolute_horizons``, None if not numeric
+        """
+        key = self._horizons_cache_key
+        if key is None or key[0] is not self.fh or not key[1].equals(self.cutoff):
+            absolute_horizons = self.fh.to_absolute_index(self.cutoff)
+            self._horizons_cache = (absolute_horizons, _isin_values(absolute_horizons))
+            self._horizons_cache_key = (self.fh, self.cutoff)
+        return self._horizons_cache
+
+    def _prepare_frame(self, X, y):
+        """Combine X and y to a frame with normal columns as pytorch-forecasting needs.
+
+        Parameters
+        ----------
+        X : pd.DataFrame or None
+            exogeneous time series, with the same index as y
+        y : pd.DataFrame
+            target time series
 
+        Returns
+        -------
+        data : pd.DataFrame
+            frame with RangeIndex, the index levels of y as columns,
+            the columns of X, the target column and the ``_auto_time_idx`` column
+        time_varying_known_reals : list of str
+            names of the numeric columns of X in ``data``
+        """
+        # the index levels, X and y columns are renamed
+        # to self._new_index_names, self._new_X_columns, self._new_target_name
+        # which are set in fit
         # X, y must have same index or X is None
-        # assert X is None or (X.index == y.index).all()
-        # might not the same order
-        # rename the index to make sure it's not None
-        self._new_index_names = [
-            "_index_name_" + str(i) for i in range(len(self._index_names))
-        ]
+        # might not the same order, the order of X is used
+        index = y.index if X is None else X.index
+        # assemble all columns at once, the index levels become normal columns
+        columns = {}
+        # add a constant column as group id if data only contains only one timeseries
         if self._index_len == 1:
-            rename_input = self._new_index_names[0]
-        else:
-            rename_input = self._new_index_names
-        y.index.rename(rename_input, inplace=True)
+            columns["_auto_group_id"] = np.zeros(len(index), dtype=np.int64)
+        for i, name in enumerate(self._new_index_names):
+            columns[name] = index.get_level_values(i)
+        target = y.iloc[:, -1]
         if X is not None:
-            X.index.rename(rename_input, inplace=True)
-        # rename X, y columns names to make sure they are all str type
-        if X is not None:
-            self._new_X_columns = [
-                "_X_column_" + str(i) for i in range(len(self._X_columns))
-            ]
+            # rename X columns names to make sure they are all str type
+            # shallow copy, only the column labels of X are replaced
+            X = X.copy(deep=False)
             X.columns = self._new_X_columns
-        self._new_target_name = "_target_column"
-        y.columns = [self._new_target_name]
-        # combine X and y
-        if X is not None:
-            # only numeric columns
-            time_varying_known_reals = [
-                c for c in X.columns if is_numeric_dtype(X[c].dtype)
-            ]
-            data = X.join(y, on=X.index.names)
+            for name, column in X.items():
+                columns[name] = column.array
+            # only numeric columns, determined once in fit,
+            # X has the same columns in predict
+            if self._time_varying_known_reals is None:
+                self._time_varying_known_reals = [
+                    c for c, dtype in X.dtypes.items() if is_numeric_dtype(dtype)
+                ]
+            time_varying_known_reals = self._time_varying_known_reals
+            # no assert on the index, X and y are only aligned if needed,
+            # equals returns early for the same object or a different length
+            if not target.index.equals(index):
+                target = target.reindex(index)
         else:
             time_varying_known_reals = []
-            data = deepcopy(y)
         # if fh is not continuous, there will be NaN after extend_y in prediect
-        data["_target_column"].fillna(0, inplace=True)
+        if target.hasnans:
+            target = target.fillna(0)
+        columns[self._new_target_name] = target.to_numpy()
         # add integer time_idx column as pytorch-forecasting requires
         if self._index_len > 1:
-            time_idx = (
-                data.groupby(by=self._new_index_names[0:-1]).cumcount().to_frame()
-            )
+            columns["_auto_time_idx"] = _cumcount_instances(index)
         else:
-            time_idx = pd.DataFrame(range(0, len(data)))
-            time_idx.index = data.index
-        time_idx.rename(columns={0: "_auto_time_idx"}, inplace=True)
-        data = pd.concat([data, time_idx], axis=1)
-        # reset multi index to normal columns
-        data = data.reset_index(level=list(range(self._index_len)))
-        training_cutoff = data["_auto_time_idx"].max() - max_prediction_length
-        # add a constant column as group id if data only contains only one timeseries
-        if self._index_len == 1:
-            group_id = pd.DataFrame([0] * len(data))
-            group_id.index = data.index
-            group_id.rename(columns={0: "_auto_group_id"}, inplace=True)
-            data = pd.concat([group_id, data], axis=1)
-        # save origin time idx for prediction
-        self._origin_time_idx = data[
-            (
-                ([] if self._index_len > 1 else ["_auto_group_id"])
-                + self._new_index_names
-                + ["_auto_time_idx"]
+            columns["_auto_time_idx"] = np.arange(len(index))
+        data = pd.DataFrame(columns)
+        return data, time_varying_known_reals
+
+    def _Xy_to_dataset(
+        self,
+        X: pd.DataFrame,
+        y: pd.DataFrame,
+        dataset_params: Dict[str, Any],
+        max_prediction_length,
+        predict_only: bool = False,
+    ):
+        """Convert X and y to pytorch-forecasting training and validation datasets.
+
+        Parameters
+        ----------
+        X : pd.DataFrame or None
+            exogeneous time series, with the same index as y
+        y : pd.DataFrame
+            target time series
+        dataset_params : dict
+            keyword arguments for ``TimeSeriesDataSet``,
+            overwrite the inferred ones
+        max_prediction_length : int
+            number of time points to be predicted
+        predict_only : bool, optional (default=False)
+            if True, no new training dataset is constructed, the one from fit
+            is used as template for the validation dataset,
+            so its fitted encoders and scalers are reused.
+            Only valid if y contains no instances unseen in fit.
+
+        Returns
+        -------
+        training : TimeSeriesDataSet
+            dataset with the time points up to the last max_prediction_length ones,
+            the one from fit if predict_only is True
+        validation : TimeSeriesDataSet
+            dataset to predict the last max_prediction_length time points
+        """
+        tsds = _tsds()
+        data, time_varying_known_reals = self._prepare_frame(X, y)
+        time_idx = data["_auto_time_idx"].to_numpy()
+        training_cutoff = time_idx.max() - max_prediction_length
+        # boolean ndarray for iloc, avoids aligning a boolean Series on the index
+        train_mask = time_idx <= training_cutoff
+        group_ids = (
+            self._new_index_names[0:-1] if self._index_len > 1 else ["_auto_group_id"]
+        )
+        # save origin time idx for prediction,
+        # indexed by instance and time_idx as looked up in _predictions_to_dataframe
+        origin_time_idx = data.iloc[
+            ~train_mask,
+            data.columns.get_indexer(
+                group_ids + ["_auto_time_idx", self._new_index_names[-1]]
+            ),
+        ]
+        self._origin_time_idx = origin_time_idx.set_index(
+            group_ids + ["_auto_time_idx"]
+        )[self._new_index_names[-1]]
+        if predict_only:
+            # skip fitting scalers and encoders again
+            training = self._training_dataset
+            validation = tsds.from_dataset(
+                training, data, predict=True, stop_randomization=True
             )
-        ][data["_auto_time_idx"] > training_cutoff]
+            return training, validation
         # infer time_idx column, target column and instances from data
         _dataset_params = {
-            "data": data[data["_auto_time_idx"] <= training_cutoff],
+            "data": data.iloc[train_mask],
             "time_idx": "_auto_time_idx",
             "target": self._new_target_name,
-            "group_ids": (
-                self._new_index_names[0:-1]
-                if self._index_len > 1
-                else ["_auto_group_id"]
-            ),
+            "group_ids": group_ids,
             "time_varying_known_reals": time_varying_known_reals,
             "time_varying_unknown_reals": [self._new_target_name],
         }
         _dataset_params.update(dataset_params)
         # overwrite max_prediction_length
         _dataset_params["max_prediction_length"] = int(max_prediction_length)
-        training = TimeSeriesDataSet(**_dataset_params)
-        validation = TimeSeriesDataSet.from_dataset(
+        training = tsds(**_dataset_params)
+        validation = tsds.from_dataset(
             training, data, predict=True, stop_randomization=True
         )
         return training, validation
 
     def _predictions_to_dataframe(self, predictions, max_prediction_length):
+        import torch
+
         # output is the actual predictions points but without index
-        output = predictions.output.cpu().numpy()
+        output = predictions.output.detach()
+        # if output is on gpu, it is copied to pinned host memory asynchronously,
+        # the index is prepared below while the copy is in flight
+        if output.is_cuda:
+            host_output = torch.empty(
+                output.shape, dtype=output.dtype, device="cpu", pin_memory=True
+            )
+            host_output.copy_(output, non_blocking=True)
+        else:
+            host_output = output
         # index will be combined with output
         index = predictions.index
         # in pytorch-forecasting predictions, the first index is the time_idx
         index_names = index.columns.to_list()
         time_idx = index_names.pop(0)
-        # make time_idx the last index
-        index_names.append(time_idx)
+        # the other columns identify the instance
+        group_names = index_names
         # in pytorch-forecasting predictions,
         # the index only contains the start timepoint.
-        data = index.loc[index.index.repeat(max_prediction_length)].reset_index(
-            drop=True
-        )
-        # make time_idx the last index
-        data = data.reindex(columns=index_names)
-        # add the target column at the end
-        data[self._target_name] = output.flatten()
+        # each instance column is repeated, the time_idx is corrected below
+        group_arrays = [
+            index[c].array.repeat(max_prediction_length) for c in group_names
+        ]
         # correct the time_idx after repeating
         # assume the time_idx column is continuous integers
         # it's always true as a new time_idx column is added
         # to the data before it's passed to underlying model
-        for i in range(output.shape[0]):
-            start_idx = i * max_prediction_length
-            start_time = data.loc[start_idx, time_idx]
-            data.loc[
-                start_idx : start_idx + max_prediction_length - 1, time_idx
-            ] = list(range(start_time, start_time + max_prediction_length))
-
-        # set the instance columns to multi index
-        data.set_index(index_names, inplace=True)
-        self._origin_time_idx.set_index(index_names, inplace=True)
-        # add origin time_idx column to data
-        data = data.join(self._origin_time_idx, on=index_names)
-        # drop _auto_time_idx column
-        data.reset_index(level=list(range(len(index_names))), inplace=True)
-        data.drop("_auto_time_idx", axis=1, inplace=True)
-        index_names.remove("_auto_time_idx")
-        # drop _auto_group_id column
-        if self._index_len == 1:
-            data.drop("_auto_group_id", axis=1, inplace=True)
-            index_names.remove("_auto_group_id")
-        # reindex to origin multiindex
-        # the last of self._new_index_names is the time index
-        data.set_index(
-            index_names + [self._new_index_names[-1]],
-            inplace=True,
+        n_instances, horizon = output.shape[0], int(max_prediction_length)
+        # the start time points are the time_idx of the not repeated index
+        start_times = (
+            index[time_idx].to_numpy()[:n_instances].astype(np.int64, copy=False)
+        )
+        new_time_idx = (
+            start_times[:, None] + np.arange(horizon, dtype=np.int64)[None, :]
+        ).ravel()
+        # look up the origin time index by instance and time_idx,
+        # self._origin_time_idx is already indexed by them
+        lookup_index = pd.MultiIndex.from_arrays(
+            group_arrays + [new_time_idx], names=group_names + [time_idx]
         )
-        # set index names back to original input in fit
+        time_values = self._origin_time_idx.reindex(lookup_index).array
+        # build the origin index directly from the arrays,
+        # the constant _auto_group_id is dropped
+        # and index names are set back to original input in fit
         if self._index_len == 1:
-            rename_input = self._index_names[0]
+            new_index = pd.Index(time_values, name=self._index_names[0])
         else:
-            rename_input = self._index_names
-        data.index.rename(rename_input, inplace=True)
+            # the instance levels are already factorized in lookup_index,
+            # only the time points are new
+            time_codes, time_levels = pd.factorize(time_values, sort=True)
+            new_index = pd.MultiIndex(
+                levels=list(lookup_index.levels[:-1]) + [time_levels],
+                codes=list(lookup_index.codes[:-1]) + [time_codes],
+                names=self._index_names,
+                verify_integrity=False,
+            )
+        # wait for the copy to host to finish
+        if output.is_cuda:
+            torch.cuda.synchronize(output.device)
+        # numpy has no bfloat16, half precision outputs are cast to float32 in torch
+        if host_output.dtype in (torch.float16, torch.bfloat16):
+            host_output = host_output.float()
+        # output is (n_instances, horizon) in the same order as new_index,
+        # reshape of the contiguous array is a view, flatten would always copy
+        values = np.ascontiguousarray(host_output.numpy()).reshape(-1)
         # set target name back to original input in fit
-        data.columns = [self._target_name]
         # convert back to pd.series if needed
         if self._convert_to_series:
-            data = pd.Series(
-                data=data[self._target_name], index=data.index, name=self._target_name
-            )
-        return data
+            return pd.Series(data=values, index=new_index, name=self._target_name)
+        return pd.DataFrame({self._target_name: values}, index=new_index, copy=False)
 
     def _dummy_X(self, X, y):
         rX = self.algorithm_class.__name__ == "TemporalFusionTransformer"
@@ -488,7 +676,11 @@ class _PytorchForecastingAdapter(_BaseGlobalForecaster):
                 "TemporalFusionTransformer requires X!\
                 A constant dummy X with values all zero will be used!"
             )
-            X = pd.DataFrame(data=np.zeros(len(y)), index=y.index)
+            # float32 halves the memory of the dummy column,
+            # a read-only broadcast array is not used as it might be modified later
+            X = pd.DataFrame(
+                data=np.zeros((len(y), 1), dtype=np.float32), index=y.index, copy=False
+            )
         return X
 
     def _extend_y(self, y: pd.DataFrame, fh: ForecastingHorizon):
@@ -498,27 +690,218 @@ class _PytorchForecastingAdapter(_BaseGlobalForecaster):
             freq=fh.freq,
         )
         index = _fh.to_absolute_index(self.cutoff)
-        _y = pd.DataFrame(index=index, columns=y.columns)
-        _y.index.rename(y.index.names[-1], inplace=True)
-        _y.fillna(0, inplace=True)
         len_levels = len(y.index.names)
         if len_levels == 1:
-            _y = pd.concat([y, _y])
+            ext_index = index.rename(y.index.names[-1])
         else:
-            _y = y.groupby(level=list(range(len_levels - 1))).apply(
-                lambda x: pd.concat([x.droplevel(list(range(len_levels - 1))), _y])
+            # extension rows of all instances at once,
+            # the cross product of instances and new time points
+            instances = y.index.droplevel(-1).unique()
+            ext_index = pd.MultiIndex.from_arrays(
+                [
+                    instances.get_level_values(i).repeat(len(index))
+                    for i in range(len_levels - 1)
+                ]
+                + [index.take(np.tile(np.arange(len(index)), len(instances)))],
+                names=y.index.names,
             )
-        return _y
+        # union sorts the index, the new time points are filled with 0
+        return y.reindex(y.index.union(ext_index), fill_value=0)
+
+
+@functools.lru_cache(maxsize=1)
+def _pl():
+    """Import ``lightning.pytorch`` once, later calls skip the import machinery."""
+    import lightning.pytorch as pl
+
+    return pl
+
+
+@functools.lru_cache(maxsize=1)
+def _tsds():
+    """Import ``TimeSeriesDataSet`` once, later calls skip the import machinery."""
+    from pytorch_forecasting.data import TimeSeriesDataSet
+
+    return TimeSeriesDataSet
+
+
+def _set_trainer_defaults(trainer_params):
+    """Set defaults of ``Trainer`` parameters for multi gpu training inplace.
+
+    If more than one gpu is visible, the trainer is not restricted to cpu
+    and ``devices`` is not set or asks for more than one device,
+    batch norm statistics are synchronized across devices and DDP is used with
+    gradients as views into the allreduce buckets, saving one gradient copy,
+    and with a static graph, as the models train the same graph every step.
+    A ``strategy="ddp"`` set by the user only gets the bucket view option,
+    a static graph is a constraint on the model and not assumed for it.
+    In interactive sessions the strategy is left to lightning,
+    as the ``"ddp"`` launcher requires a script.
+    Keys set by the user are kept.
+
+    Parameters
+    ----------
+    trainer_params : dict
+        keyword arguments for ``lightning.pytorch.Trainer``
+
+    Returns
+    -------
+    trainer_params : dict
+        reference to the updated ``trainer_params``
+    """
+    import torch
+
+    if (
+        torch.cuda.device_count() < 2
+        or trainer_params.get("accelerator") == "cpu"
+        or not _is_multi_device(trainer_params.get("devices", "auto"))
+    ):
+        return trainer_params
+    trainer_params.setdefault("sync_batchnorm", True)
+    interactive = hasattr(sys, "ps1") or bool(sys.flags.interactive)
+    if "strategy" not in trainer_params and not interactive:
+        from lightning.pytorch.strategies import DDPStrategy
+
+        trainer_params["strategy"] = DDPStrategy(
+            gradient_as_bucket_view=True,
+            static_graph=True,
+            find_unused_parameters=False,
+        )
+    elif trainer_params.get("strategy") == "ddp":
+        from lightning.pytorch.strategies import DDPStrategy
+
+        trainer_params["strategy"] = DDPStrategy(gradient_as_bucket_view=True)
+    return trainer_params
+
+
+def _is_multi_device(devices):
+    """Check if the ``devices`` argument of ``Trainer`` can select several devices.
+
+    Parameters
+    ----------
+    devices : int, str, list of int or None
+        ``devices`` argument of ``lightning.pytorch.Trainer``,
+        e.g., ``"auto"``, ``-1``, ``2``, ``"0,1"`` or ``[0]``
+
+    Returns
+    -------
+    bool
+        False if exactly one device or none is selected, True otherwise
+    """
+    if devices is None:
+        return True
+    if isinstance(devices, str):
+        devices = devices.strip()
+        if devices in ("auto", "-1"):
+            return True
+        if "," in devices:
+            return len([d for d in devices.split(",") if d.strip()]) > 1
+        try:
+            devices = int(devices)
+        except ValueError:
+            return True
+    if isinstance(devices, int):
+        return devices == -1 or devices > 1
+    return len(devices) > 1
+
+
+def _set_dataloader_defaults(params, trainer_params):
+    """Set defaults of ``to_dataloader`` parameters for gpu training inplace.
+
+    Worker processes and pinned memory only pay off if batches are sent to a gpu,
+    so nothing is set if cuda is not available or the trainer is set to cpu.
+    Keys set by the user are kept.
+
+    Parameters
+    ----------
+    params : dict
+        keyword arguments for ``TimeSeriesDataSet.to_dataloader()``
+    trainer_params : dict
+        keyword arguments for ``lightning.pytorch.Trainer``
+
+    Returns
+    -------
+    params : dict
+        reference to the updated ``params``
+    """
+    import torch
+
+    if not torch.cuda.is_available() or trainer_params.get("accelerator") == "cpu":
+        return params
+    # half of the cores, the others are left to the main process
+    params.setdefault("num_workers", min(8, max(1, (os.cpu_count() or 2) // 2)))
+    params.setdefault("pin_memory", True)
+    # only valid with worker processes
+    if params["num_workers"] > 0:
+        params.setdefault("persistent_workers", True)
+        params.setdefault("prefetch_factor", 4)
+    return params
+
+
+def _isin_values(index):
+    """Get numeric values of index to be used in ``np.isin``.
+
+    Parameters
+    ----------
+    index : pd.Index
+
+    Returns
+    -------
+    np.ndarray or None
+        int64 values for datetime-like index, values for numeric index,
+        None otherwise
+    """
+    if isinstance(index, (pd.DatetimeIndex, pd.PeriodIndex, pd.TimedeltaIndex)):
+        return index.asi8
+    if is_numeric_dtype(index.dtype):
+        return index.to_numpy()
+    return None
+
+
+def _cumcount_instances(index):
+    """Number the rows within each instance, same as ``groupby(...).cumcount()``.
+
+    Parameters
+    ----------
+    index : pd.MultiIndex
+        index with the instance levels first and the time level last
+
+    Returns
+    -------
+    np.ndarray
+        integer position of each row within its instance
+    """
+    n = len(index)
+    # the level codes of the MultiIndex are used, no hashing of the instances
+    instance_codes = np.vstack([np.asarray(c) for c in index.codes[:-1]])
+    change = np.ones(n, dtype=bool)
+    change[1:] = (instance_codes[:, 1:] != instance_codes[:, :-1]).any(axis=0)
+    starts = np.flatnonzero(change)
+    # instances are contiguous, as for sorted sktime panels,
+    # if every run of equal codes belongs to a different instance
+    if n == 0 or np.unique(instance_codes[:, starts], axis=1).shape[1] == len(starts):
+        counts = np.diff(np.r_[starts, n])
+        return np.arange(n, dtype=np.int64) - np.repeat(starts, counts)
+    codes, _ = pd.factorize(index.droplevel(-1))
+    # stable sort keeps the time order within instances
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    counts = np.diff(np.r_[starts, n])
+    cumcount = np.empty(n, dtype=np.int64)
+    cumcount[order] = np.arange(n) - np.repeat(starts, counts)
+    return cumcount
 
 
 def _series_to_frame(data):
     converted = False
     if data is not None:
         if isinstance(data, pd.Series):
-            _data = deepcopy(data).to_frame(name=data.name)
+            _data = data.to_frame(name=data.name)
             converted = True
         else:
-            _data = deepcopy(data)
+            # not copied, data is never modified inplace
+            _data = data
     else:
         _data = None
     return _data, converted
@@ -30,11 +30,19 @@ class PytorchForecastingTFT(_PytorchForecastingAdapter):
     validation_to_dataloader_params : Dict[str, Any] (default=None)
         parameters to be passed for `TimeSeriesDataSet.to_dataloader()`
         by default {"train": False}
+    compile_model : bool (default=False)
+        whether to compile the model with `torch.compile` [3]_ for training and
+        prediction, compilation happens in the first forward pass.
+        If True and cuda is available, training uses mixed precision by default,
+        bf16 if supported by the gpu, else fp16,
+        unless precision is set in trainer_params
+        or the accelerator in trainer_params is cpu.
 
     References
     ----------
     .. [1] https://pytorch-forecasting.readthedocs.io/en/stable/api/pytorch_forecasting.models.temporal_fusion_transformer.TemporalFusionTransformer.html
     .. [2] https://pytorch-forecasting.readthedocs.io/en/stable/api/pytorch_forecasting.data.timeseries.TimeSeriesDataSet.html
+    .. [3] https://pytorch.org/docs/stable/generated/torch.compile.html
     """  # noqa: E501
 
     _tags = {
@@ -63,6 +71,7 @@ class PytorchForecastingTFT(_PytorchForecastingAdapter):
         trainer_params: Optional[Dict[str, Any]] = None,
         model_path: Optional[str] = None,
         random_log_path: bool = False,
+        compile_model: bool = False,
     ) -> None:
         self.allowed_encoder_known_variable_names = allowed_encoder_known_variable_names
         super().__init__(
@@ -73,6 +82,7 @@ class PytorchForecastingTFT(_PytorchForecastingAdapter):
             trainer_params,
             model_path,
             random_log_path,
+            compile_model,
         )
 
     @functools.cached_property
@@ -222,11 +232,19 @@ class PytorchForecastingNBeats(_PytorchForecastingAdapter):
     validation_to_dataloader_params : Dict[str, Any] (default=None)
         parameters to be passed for `TimeSeriesDataSet.to_dataloader()`
         by default {"train": False}
+    compile_model : bool (default=False)
+        whether to compile the model with `torch.compile` [3]_ for training and
+        prediction, compilation happens in the first forward pass.
+        If True and cuda is available, training uses mixed precision by default,
+        bf16 if supported by the gpu, else fp16,
+        unless precision is set in trainer_params
+        or the accelerator in trainer_params is cpu.
 
     References
     ----------
     .. [1] https://pytorch-forecasting.readthedocs.io/en/stable/api/pytorch_forecasting.models.nbeats.NBeats.html
     .. [2] https://pytorch-forecasting.readthedocs.io/en/stable/api/pytorch_forecasting.data.timeseries.TimeSeriesDataSet.html
+    .. [3] https://pytorch.org/docs/stable/generated/torch.compile.html
     """  # noqa: E501
 
     _tags = {
@@ -255,6 +273,7 @@ class PytorchForecastingNBeats(_PytorchForecastingAdapter):
         trainer_params: Optional[Dict[str, Any]] = None,
         model_path: Optional[str] = None,
         random_log_path: bool = False,
+        compile_model: bool = False,
     ) -> None:
         super().__init__(
             model_params,
@@ -264,6 +283,7 @@ class PytorchForecastingNBeats(_PytorchForecastingAdapter):
             trainer_params,
             model_path,
             random_log_path,
+            compile_model,
         )
 
     @functools.cached_property
@@ -0,0 +1,366 @@
+# copyright: sktime developers, BSD-3-Clause License (see LICENSE file)
+"""Tests for interfacing estimators from pytorch-forecasting."""
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sktime.forecasting.base import ForecastingHorizon
+from sktime.forecasting.base.adapters._pytorchforecasting import (
+    _cumcount_instances,
+    _is_multi_device,
+    _isin_values,
+    _set_dataloader_defaults,
+    _set_trainer_defaults,
+)
+from sktime.forecasting.pytorchforecasting import PytorchForecastingNBeats
+from sktime.tests.test_switch import run_test_for_class, run_test_module_changed
+from sktime.utils.dependencies import _check_soft_dependencies
+from sktime.utils._testing.hierarchical import _make_hierarchical
+
+__author__ = ["XinyuWu"]
+
+ADAPTER_MODULE = "sktime.forecasting.base.adapters._pytorchforecasting"
+
+
+def _panel_index(instances, n_timepoints, interleaved=False):
+    """Make a panel index, rows ordered by instance or by time point."""
+    time_index = pd.period_range("2000-01", periods=n_timepoints, freq="M")
+    index = pd.MultiIndex.from_product(
+        [*instances, time_index], names=[f"h{i}" for i in range(len(instances))] + ["t"]
+    )
+    if interleaved:
+        # all instances at the first time point, then at the second, ...
+        index = index[
+            np.argsort(
+                np.tile(np.arange(n_timepoints), len(index) // n_timepoints),
+                kind="stable",
+            )
+        ]
+    return index
+
+
+@pytest.mark.skipif(
+    not run_test_module_changed(ADAPTER_MODULE),
+    reason="run test only if the adapter module has changed",
+)
+@pytest.mark.parametrize(
+    "index",
+    [
+        _panel_index([["a", "b", "c"]], 5),
+        _panel_index([["a", "b", "c"]], 5, interleaved=True),
+        _panel_index([["a", "b"], [1, 2]], 4),
+        _panel_index([["a", "b"], [1, 2]], 4, interleaved=True),
+        # instances are not sorted and one instance appears in two runs
+        pd.MultiIndex.from_arrays(
+            [["b", "b", "a", "a", "b", "c"], [0, 1, 0, 1, 2, 0]], names=["h0", "t"]
+        ),
+    ],
+)
+def test_cumcount_instances(index):
+    """Test that _cumcount_instances numbers the rows as groupby cumcount."""
+    expected = (
+        pd.DataFrame(index=index)
+        .groupby(level=list(range(index.nlevels - 1)), sort=False)
+        .cumcount()
+        .to_numpy()
+    )
+    np.testing.assert_array_equal(_cumcount_instances(index), expected)
+
+
+@pytest.mark.skipif(
+    not run_test_module_changed(ADAPTER_MODULE),
+    reason="run test only if the adapter module has changed",
+)
+@pytest.mark.parametrize(
+    "index, values",
+    [
+        (pd.Index([3, 5, 7, 9]), pd.Index([5, 9, 11])),
+        (pd.Index([0.5, 1.5, 2.5]), pd.Index([1.5])),
+        (
+            pd.period_range("2000-01", periods=6, freq="M"),
+            pd.PeriodIndex(["2000-02", "2000-04", "2001-01"], freq="M"),
+        ),
+        (
+            pd.date_range("2000-01-01", periods=6, freq="D"),
+            pd.DatetimeIndex(["2000-01-03", "2000-01-05"]),
+        ),
+    ],
+)
+def test_isin_values(index, values):
+    """Test that np.isin on _isin_values is the same as Index.isin."""
+    np.testing.assert_array_equal(
+        np.isin(_isin_values(index), _isin_values(values)), index.isin(values)
+    )
+
+
+@pytest.mark.skipif(
+    not run_test_module_changed(ADAPTER_MODULE),
+    reason="run test only if the adapter module has changed",
+)
+def test_isin_values_not_numeric():
+    """Test that _isin_values returns None for not numeric indices."""
+    assert _isin_values(pd.Index(["a", "b"])) is None
+
+
+@pytest.mark.skipif(
+    not run_test_module_changed(ADAPTER_MODULE),
+    reason="run test only if the adapter module has changed",
+)
+@pytest.mark.parametrize(
+    "devices, expected",
+    [
+        (None, True),
+        ("auto", True),
+        (-1, True),
+        ("-1", True),
+        (2, True),
+        ("2", True),
+        ("0,1", True),
+        ([0, 1], True),
+        (1, False),
+        ("1", False),
+        ("0,", False),
+        ([0], False),
+    ],
+)
+def test_is_multi_device(devices, expected):
+    """Test that _is_multi_device detects if devices selects several devices."""
+    assert _is_multi_device(devices) is expected
+
+
+@pytest.mark.skipif(
+    not run_test_module_changed(ADAPTER_MODULE)
+    or not _check_soft_dependencies("torch", "lightning", severity="none"),
+    reason="run test only if softdeps are present and the adapter module has changed",
+)
+@pytest.mark.parametrize(
+    "n_gpus, trainer_params",
+    [
+        (1, {}),
+        (2, {"accelerator": "cpu"}),
+        (2, {"devices": 1}),
+        (2, {"devices": [0]}),
+        (2, {"devices": "1"}),
+    ],
+)
+def test_set_trainer_defaults_single_device(monkeypatch, n_gpus, trainer_params):
+    """Test that no multi gpu defaults are set if only one device is used."""
+    import torch
+
+    monkeypatch.setattr(torch.cuda, "device_count", lambda: n_gpus)
+    monkeypatch.delattr(sys, "ps1", raising=False)
+    expected = dict(trainer_params)
+    assert _set_trainer_defaults(trainer_params) == expected
+
+
+@pytest.mark.skipif(
+    not run_test_module_changed(ADAPTER_MODULE)
+    or not _check_soft_dependencies("torch", "lightning", severity="none"),
+    reason="run test only if softdeps are present and the adapter module has changed",
+)
+@pytest.mark.parametrize(
+    "trainer_params", [{}, {"devices": "auto"}, {"devices": -1}, {"devices": 2}]
+)
+def test_set_trainer_defaults_multi_gpu(monkeypatch, trainer_params):
+    """Test that DDP with a static graph is the default on several gpus."""
+    import torch
+    from lightning.pytorch.strategies import DDPStrategy
+
+    monkeypatch.setattr(torch.cuda, "device_count", lambda: 2)
+    monkeypatch.delattr(sys, "ps1", raising=False)
+    params = _set_trainer_defaults(trainer_params)
+
+    assert params is trainer_params
+    assert params["sync_batchnorm"] is True
+    assert isinstance(params["strategy"], DDPStrategy)
+    assert params["strategy"]._ddp_kwargs == {
+        "gradient_as_bucket_view": True,
+        "static_graph": True,
+        "find_unused_parameters": False,
+    }
+
+
+@pytest.mark.skipif(
+    not run_test_module_changed(ADAPTER_MODULE)
+    or not _check_soft_dependencies("torch", "lightning", severity="none"),
+    reason="run test only if softdeps are present and the adapter module has changed",
+)
+def test_set_trainer_defaults_interactive(monkeypatch):
+    """Test that the strategy is left to lightning in interactive sessions."""
+    import torch
+
+    monkeypatch.setattr(torch.cuda, "device_count", lambda: 2)
+    monkeypatch.setattr(sys, "ps1", ">>> ", raising=False)
+    assert _set_trainer_defaults({}) == {"sync_batchnorm": True}
+
+
+@pytest.mark.skipif(
+    not run_test_module_changed(ADAPTER_MODULE)
+    or not _check_soft_dependencies("torch", "lightning", severity="none"),
+    reason="run test only if softdeps are present and the adapter module has changed",
+)
+def test_set_trainer_defaults_user_keys(monkeypatch):
+    """Test that keys set by the user are kept by _set_trainer_defaults."""
+    import torch
+    from lightning.pytorch.strategies import DDPStrategy
+
+    monkeypatch.setattr(torch.cuda, "device_count", lambda: 2)
+    monkeypatch.delattr(sys, "ps1", raising=False)
+
+    params = _set_trainer_defaults({"strategy": "ddp", "sync_batchnorm": False})
+    assert params["sync_batchnorm"] is False
+    # a ddp string of the user gets the bucket view, but no static graph
+    assert isinstance(params["strategy"], DDPStrategy)
+    assert params["strategy"]._ddp_kwargs == {"gradient_as_bucket_view": True}
+
+    params = _set_trainer_defaults({"strategy": "ddp_spawn"})
+    assert params == {"strategy": "ddp_spawn", "sync_batchnorm": True}
+
+
+@pytest.mark.skipif(
+    not run_test_module_changed(ADAPTER_MODULE)
+    or not _check_soft_dependencies("torch", severity="none"),
+    reason="run test only if softdeps are present and the adapter module has changed",
+)
+@pytest.mark.parametrize(
+    "cuda, trainer_params", [(False, {}), (True, {"accelerator": "cpu"})]
+)
+def test_set_dataloader_defaults_no_gpu(monkeypatch, cuda, trainer_params):
+    """Test that no dataloader defaults are set if no gpu is used."""
+    import torch
+
+    monkeypatch.setattr(torch.cuda, "is_available", lambda: cuda)
+    assert _set_dataloader_defaults({"batch_size": 8}, trainer_params) == {
+        "batch_size": 8
+    }
+
+
+@pytest.mark.skipif(
+    not run_test_module_changed(ADAPTER_MODULE)
+    or not _check_soft_dependencies("torch", severity="none"),
+    reason="run test only if softdeps are present and the adapter module has changed",
+)
+@pytest.mark.parametrize(
+    "params, expected",
+    [
+        (
+            {},
+            {
+                "num_workers": 4,
+                "pin_memory": True,
+                "persistent_workers": True,
+                "prefetch_factor": 4,
+            },
+        ),
+        # worker options are only set with worker processes
+        (
+            {"num_workers": 0, "pin_memory": False},
+            {"num_workers": 0, "pin_memory": False},
+        ),
+        (
+            {"num_workers": 2, "prefetch_factor": 2},
+            {
+                "num_workers": 2,
+                "pin_memory": True,
+                "persistent_workers": True,
+                "prefetch_factor": 2,
+            },
+        ),
+    ],
+)
+def test_set_dataloader_defaults_gpu(monkeypatch, params, expected):
+    """Test the dataloader defaults on gpu and that user keys are kept."""
+    import torch
+
+    monkeypatch.setattr(torch.cuda, "is_available", lambda: True)
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    result = _set_dataloader_defaults(params, {})
+    assert result is params
+    assert result == expected
+
+
+@pytest.mark.skipif(
+    not run_test_for_class(PytorchForecastingNBeats),
+    reason="run test only if softdeps are present and incrementally (if requested)",
+)
+@pytest.mark.parametrize("interleaved", [False, True])
+def test_extend_y_panel(interleaved):
+    """Test that _extend_y adds max_prediction_length zeros to each instance."""
+    index = _panel_index([["a", "b", "c"]], 6, interleaved=interleaved)
+    y = pd.DataFrame({"y": np.arange(1.0, len(index) + 1)}, index=index)
+    cutoff = pd.PeriodIndex(["2000-06"], freq="M")
+    forecaster = PytorchForecastingNBeats()
+    forecaster._set_cutoff(cutoff)
+    forecaster._max_prediction_length = 4
+
+    # gapped fh, all time points up to the largest step are added
+    fh = ForecastingHorizon([2, 4], is_relative=True, freq="M")
+    y_ext = forecaster._extend_y(y, fh)
+
+    new_index = pd.MultiIndex.from_product(
+        [["a", "b", "c"], pd.period_range("2000-07", periods=4, freq="M")],
+        names=["h0", "t"],
+    )
+    expected = pd.concat([y, pd.DataFrame({"y": 0.0}, index=new_index)]).sort_index()
+    pd.testing.assert_frame_equal(y_ext, expected)
+
+
+@pytest.mark.skipif(
+    not run_test_for_class(PytorchForecastingNBeats),
+    reason="run test only if softdeps are present and incrementally (if requested)",
+)
+def test_predict_panel_gapped_fh():
+    """Test that predict returns the original index at a gapped fh for panels."""
+    y = _make_hierarchical(
+        hierarchy_levels=(3,),
+        min_timepoints=20,
+        max_timepoints=20,
+        index_type="period",
+        random_state=0,
+    )
+    forecaster = PytorchForecastingNBeats(
+        **PytorchForecastingNBeats.get_test_params()[0]
+    )
+    fh = ForecastingHorizon([2, 4], is_relative=True)
+    forecaster.fit(y, fh=fh)
+    y_pred = forecaster.predict()
+
+    cutoff = y.index.get_level_values(-1).max()
+    expected_index = pd.MultiIndex.from_product(
+        [y.index.droplevel(-1).unique(), pd.PeriodIndex([cutoff + 2, cutoff + 4])],
+        names=y.index.names,
+    )
+    pd.testing.assert_index_equal(y_pred.index, expected_index)
+    assert not y_pred.isna().any().any()
+
+
+@pytest.mark.skipif(
+    not run_test_for_class(PytorchForecastingNBeats),
+    reason="run test only if softdeps are present and incrementally (if requested)",
+)
+def test_compile_model_pickle():
+    """Test that a forecaster with compile_model=True can be pickled after predict."""
+    y = _make_hierarchical(
+        hierarchy_levels=(2,),
+        min_timepoints=20,
+        max_timepoints=20,
+        index_type="period",
+        random_state=0,
+    )
+    forecaster = PytorchForecastingNBeats(
+        compile_model=True, **PytorchForecastingNBeats.get_test_params()[0]
+    )
+    forecaster.fit(y, fh=[1, 2])
+    y_pred = forecaster.predict()
+
+    # the compiled forward is not left on the public best_model
+    assert "forward" not in forecaster.best_model.__dict__
+    pickle.dumps(forecaster.best_model)
+    forecaster.save()
+
+    forecaster_loaded = pickle.loads(pickle.dumps(forecaster))
+    pd.testing.assert_frame_equal(forecaster_loaded.predict(), y_pred)